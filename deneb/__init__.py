@@ -1,5 +1,3 @@
-import altair as alt
-
 from deneb.__version__ import __version__
 from .correlation_matrix import correlation_matrix
 from .lineplot import lineplot
@@ -17,16 +15,17 @@ from .utils import (
 )
 
 __all__ = [
-    convert_file,
-    colorscale,
-    correlation_matrix,
-    display_img,
-    get_style,
-    hex2rgb,
-    latex2unicode,
-    np2df,
-    pairplot,
-    rgb2hex,
-    save,
-    set_style,
+    "convert_file",
+    "colorscale",
+    "correlation_matrix",
+    "display_img",
+    "get_style",
+    "hex2rgb",
+    "latex2unicode",
+    "lineplot",
+    "np2df",
+    "pairplot",
+    "rgb2hex",
+    "save",
+    "set_style",
 ]
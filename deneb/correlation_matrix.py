@@ -1,9 +1,10 @@
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import altair as alt
+import numpy as np
 import pandas as pd
 
-from .utils import Chart
+from .utils import Chart, cache_chart
 
 
 def correlation_matrix(
@@ -17,6 +18,8 @@ def correlation_matrix(
     legend: bool = False,
     height: Optional[int] = None,
     width: Optional[int] = None,
+    compact_data: bool = True,
+    precision: Optional[int] = None,
 ) -> Chart:
     """Correlation matrix
 
@@ -31,16 +34,76 @@ def correlation_matrix(
         legend: Whether or not to show legend
         height: Height of plot in facet
         width: Width of plot in facet
+        compact_data: Whether to pass data column-wise to reduce the size of the spec
+        precision: Number of decimals correlations are rounded to before being passed
+            to Vega-Lite, None to keep full precision. Rounding may change labels and
+            font colors of correlations close to a rounding boundary or `white_font`
 
     Returns:
         Chart
     """
-    valid_metrics = [m for m in metrics if m in df.columns]
+    valid_metrics = [m for m in dict.fromkeys(metrics) if m in df.columns]
     df_valid = df[valid_metrics]
 
-    corrMatrix = df_valid.corr().reset_index().melt("index")
-    corrMatrix.columns = ["var1", "var2", "correlation"]
+    # Missing values, nullable and non-numeric dtypes require pandas, which uses
+    # pairwise-complete observations and leaves out non-numeric columns
+    fast = all(isinstance(d, np.dtype) and d.kind in "biuf" for d in df_valid.dtypes)
+    if fast:
+        values = df_valid.to_numpy(dtype=np.float64, copy=False)
+        fast = np.isfinite(values).all()
+    if fast:
+        arr = np.atleast_2d(np.corrcoef(values, rowvar=False))
+    else:
+        corr = df_valid.corr()
+        valid_metrics = list(corr.columns)
+        arr = corr.to_numpy()
+    if precision is not None:
+        arr = np.round(arr, precision)
+    n = len(valid_metrics)
+    if sparse:
+        ii, jj = np.triu_indices(n, k=1)
+    else:
+        ii, jj = np.indices((n, n)).reshape(2, -1)
+    names = np.asarray(valid_metrics, dtype=object)
+    var1, var2 = names[ii], names[jj]
+
+    if sparse:
+        # Only keep one entry per pair of metrics, ordered such that var1 < var2
+        swap = var1 > var2
+        var1, var2 = np.where(swap, var2, var1), np.where(swap, var1, var2)
+
+    corrMatrix = pd.DataFrame(
+        {
+            "var1": pd.Categorical(var1, categories=valid_metrics),
+            "var2": pd.Categorical(var2, categories=valid_metrics),
+            "correlation": arr[ii, jj],
+        }
+    )
 
+    return _build_chart(
+        corrMatrix,
+        limits=limits,
+        font_size=font_size,
+        white_font=white_font,
+        rotate_outwards=rotate_outwards,
+        legend=legend,
+        height=height,
+        width=width,
+        compact_data=compact_data,
+    )
+
+
+@cache_chart
+def _build_chart(
+    corrMatrix: pd.DataFrame,
+    limits: Optional[Union[Tuple[float], List[float]]],
+    font_size: int,
+    white_font: float,
+    rotate_outwards: bool,
+    legend: bool,
+    height: Optional[int],
+    width: Optional[int],
+) -> Chart:
     axis_params = {
         "domainWidth": 0,
         "tickWidth": 0,
@@ -78,9 +141,6 @@ def correlation_matrix(
         ),
     )
 
-    if sparse:
-        chart = chart.transform_filter("datum.var1 < datum.var2")
-
     if height is not None:
         chart = chart.properties(height=height)
 
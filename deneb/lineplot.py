@@ -1,9 +1,12 @@
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import altair as alt
+import numpy as np
 import pandas as pd
 
-from .utils import Chart
+from .utils import Chart, cache_chart, encoding_field
+
+_AGGREGATES = ("mean", "median", "min", "max", "sum")
 
 
 def lineplot(
@@ -38,6 +41,8 @@ def lineplot(
     detail: Optional[Union[str, alt.Detail]] = None,
     height: Optional[int] = None,
     width: Optional[int] = None,
+    compact_data: bool = True,
+    precompute_aggregate: bool = True,
 ) -> Chart:
     """Produces lineplot with optional errorbars and facets
 
@@ -73,10 +78,97 @@ def lineplot(
         detail: Detail encoding
         height: Height of plot in facet
         width: Width of plot in facet
+        compact_data: Whether to pass data column-wise to reduce the size of the spec
+        precompute_aggregate: Whether to aggregate y values and errorbars in pandas
+            rather than in Vega-Lite. Falls back to Vega-Lite for aggregations and
+            encodings not supported by `df.groupby`.
 
     Returns:
         Chart
     """
+    df_aggregated = None
+    if precompute_aggregate:
+        df_aggregated = _aggregate(
+            df,
+            x=x,
+            y=y,
+            aggregate=aggregate,
+            error_extent=error_extent,
+            encodings=[column, row, color, shape, detail],
+        )
+
+    return _build_chart(
+        df if df_aggregated is None else df_aggregated,
+        x=x,
+        y=y,
+        label_orient=label_orient,
+        title_orient=title_orient,
+        column=column,
+        column_title=column_title,
+        column_sort=column_sort,
+        column_labels=column_labels,
+        column_keywords=column_keywords,
+        row=row,
+        row_title=row_title,
+        row_sort=row_sort,
+        row_labels=row_labels,
+        row_keywords=row_keywords,
+        aggregate=aggregate,
+        points=points,
+        lines=lines,
+        errorbars=errorbars,
+        error_extent=error_extent,
+        limits=limits,
+        independent_x=independent_x,
+        independent_y=independent_y,
+        log_y=log_y,
+        y_axis=y_axis,
+        spacing=spacing,
+        color=color,
+        shape=shape,
+        detail=detail,
+        height=height,
+        width=width,
+        compact_data=compact_data,
+        precomputed=df_aggregated is not None,
+    )
+
+
+@cache_chart
+def _build_chart(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    label_orient: str,
+    title_orient: str,
+    column: Optional[str],
+    column_title: str,
+    column_sort: Optional[List[str]],
+    column_labels: bool,
+    column_keywords: Dict[str, Any],
+    row: Optional[str],
+    row_title: str,
+    row_sort: Optional[List[str]],
+    row_labels: bool,
+    row_keywords: Dict[str, Any],
+    aggregate: Optional[str],
+    points: bool,
+    lines: bool,
+    errorbars: bool,
+    error_extent: str,
+    limits: Optional[List[float]],
+    independent_x: bool,
+    independent_y: bool,
+    log_y: bool,
+    y_axis: Optional[alt.Axis],
+    spacing: int,
+    color: Optional[Union[str, alt.Color]],
+    shape: Optional[Union[str, alt.Shape]],
+    detail: Optional[Union[str, alt.Detail]],
+    height: Optional[int],
+    width: Optional[int],
+    precomputed: bool,
+) -> Chart:
     if color is None:
         color_kwarg = {}
     else:
@@ -105,6 +197,10 @@ def lineplot(
     if y_axis is not None:
         y_kwarg["axis"] = y_axis
 
+    if precomputed:
+        # Values of y are already aggregated by `_aggregate`
+        aggregate = alt.Undefined
+
     lines_layer = (
         alt.Chart()
         .mark_line()
@@ -129,17 +225,31 @@ def lineplot(
         )
     )
 
-    errorbars_layer = (
-        alt.Chart()
-        .mark_errorbar(extent=error_extent)
-        .encode(
-            x=alt.X(x, title=""),
-            y=alt.Y(y, **y_kwarg),
-            **color_kwarg,
-            **shape_kwarg,
-            **detail_kwarg,
+    if precomputed:
+        errorbars_layer = (
+            alt.Chart()
+            .mark_rule()
+            .encode(
+                x=alt.X(x, title=""),
+                y=alt.Y("lo", title=encoding_field(y), **y_kwarg),
+                y2=alt.Y2("hi"),
+                **color_kwarg,
+                **shape_kwarg,
+                **detail_kwarg,
+            )
+        )
+    else:
+        errorbars_layer = (
+            alt.Chart()
+            .mark_errorbar(extent=error_extent)
+            .encode(
+                x=alt.X(x, title=""),
+                y=alt.Y(y, **y_kwarg),
+                **color_kwarg,
+                **shape_kwarg,
+                **detail_kwarg,
+            )
         )
-    )
 
     layers = []
     if lines:
@@ -186,3 +296,45 @@ def lineplot(
     chart = chart.configure_header(titleOrient=title_orient, labelOrient=label_orient)
 
     return chart
+
+
+def _aggregate(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    aggregate: Optional[str],
+    error_extent: str,
+    encodings: List[Optional[Union[str, alt.SchemaBase]]],
+) -> Optional[pd.DataFrame]:
+    """Aggregates y per x and encoded fields, as done by Vega-Lite in `lineplot`
+
+    Returns:
+        Dataframe with aggregated y values and errorbars between `lo` and `hi`, or
+        None if the arguments are not supported
+    """
+    if aggregate not in _AGGREGATES or error_extent not in ("stdev", "stderr"):
+        return None
+
+    y_field = encoding_field(y)
+    keys = [encoding_field(e) for e in [x, *encodings] if e is not None]
+    if y_field is None or None in keys or y_field in keys:
+        return None
+    if {"lo", "hi"} & {y_field, *keys}:
+        # Names of the errorbar columns must not collide with other fields
+        return None
+    keys = list(dict.fromkeys(keys))
+
+    grouped = df.groupby(keys, sort=False, dropna=False, observed=True)[y_field]
+    stats = grouped.agg(["mean", "std", "count"])
+    if error_extent == "stdev":
+        error = stats["std"]
+    else:
+        error = stats["std"] / np.sqrt(stats["count"])
+
+    return pd.DataFrame(
+        {
+            y_field: grouped.agg(aggregate),
+            "lo": stats["mean"] - error,
+            "hi": stats["mean"] + error,
+        }
+    ).reset_index()
@@ -1,9 +1,10 @@
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import altair as alt
+import numpy as np
 import pandas as pd
 
-from .utils import Chart
+from .utils import Chart, cache_chart, encoding_field
 
 
 def pairplot(
@@ -22,6 +23,8 @@ def pairplot(
     width: Optional[int] = None,
     interactive: bool = False,
     debug: bool = False,
+    compact_data: bool = True,
+    facet: bool = False,
 ) -> Chart:
     """Pairplot
 
@@ -44,6 +47,12 @@ def pairplot(
         width: Width of subplot
         interactive: Turn on interactive mode (experimental)
         debug: Debug mode
+        compact_data: Whether to pass data column-wise to reduce the size of the spec
+        facet: Whether to build a single faceted chart rather than one chart per
+            panel, which is faster for many dimensions. Scales are fitted per panel
+            unless all dimensions share the same limits. Axes have no tick labels in
+            this mode, and `values`, `format`, `interactive` and `debug` have no
+            effect.
 
     Returns:
         Chart
@@ -51,18 +60,97 @@ def pairplot(
     Note:
         Build on top of https://github.com/alt-viz/alt/issues/1926.
     """
-    labels_dim = [c for c in list(df.columns) if c != field]
-    assert len(list(df.columns)) == len(labels_dim) + 1
+    cols = df.columns
+    labels_dim = [c for c in cols if c != field]
+    assert len(cols) == len(labels_dim) + 1
 
     if limits is not None:
-        assert type(limits) == list
-        if type(limits[0]) == float:
+        assert isinstance(limits, list)
+        if isinstance(limits[0], (float, int)):
             assert len(limits) == 2
             limits_dim = {d: limits for d in labels_dim}
         else:
-            assert type(limits[0]) == list
+            assert isinstance(limits[0], list)
             limits_dim = {d: limits[i] for i, d in enumerate(labels_dim)}
+    else:
+        limits_dim = None
+
+    # Histograms are binned here rather than by Vega-Lite where possible
+    by = None if color is None else encoding_field(color)
+    if by not in df.columns:
+        by = None
+
+    if facet:
+        if limits_dim is None:
+            limits_hist = {d: [df[d].min(), df[d].max()] for d in labels_dim}
+        else:
+            limits_hist = limits_dim
+        histograms = _histograms(df, limits_hist, num_bins, by=by)
+
+        domains = {tuple(lim) for lim in limits_hist.values()}
+        domain = None
+        if limits is not None and len(domains) == 1:
+            domain = list(domains.pop())
+
+        return _build_facet_chart(
+            _long_form(df, labels_dim, field, histograms),
+            labels_dim=labels_dim,
+            domain=domain,
+            scatter_size=scatter_size,
+            color=color,
+            bar_opacity=bar_opacity,
+            clip=clip,
+            height=height,
+            width=width,
+            compact_data=compact_data,
+        )
+
+    histograms = None
+    if limits is not None and (color is None or by is not None):
+        histograms = _histograms(df, limits_dim, num_bins, by=by)
+
+    chart = _build_chart(
+        df,
+        labels_dim=labels_dim,
+        limits_dim=limits_dim,
+        scatter_size=scatter_size,
+        format=format,
+        color=color,
+        num_bins=num_bins,
+        bar_opacity=bar_opacity,
+        clip=clip,
+        height=height,
+        width=width,
+        interactive=interactive,
+        debug=debug,
+        compact_data=compact_data,
+        prebinned=histograms is not None,
+    )
+
+    if histograms is not None:
+        for i, r in enumerate(labels_dim):
+            chart.vconcat[i].hconcat[i].data = histograms[r]
 
+    return chart
+
+
+@cache_chart
+def _build_chart(
+    df: pd.DataFrame,
+    labels_dim: List[str],
+    limits_dim: Optional[Dict[str, List[float]]],
+    scatter_size: float,
+    format: Optional[str],
+    color: Optional[Union[str, alt.Color]],
+    num_bins: int,
+    bar_opacity: float,
+    clip: bool,
+    height: Optional[int],
+    width: Optional[int],
+    interactive: bool,
+    debug: bool,
+    prebinned: bool,
+) -> Chart:
     axis_format = {"format": format} if format is not None else {}
 
     if color is None:
@@ -70,27 +158,28 @@ def pairplot(
     else:
         color_kwarg = {"color": color}
 
+    # Shared between panels, so that each is only constructed and validated once
+    empty_axis = alt.Axis(title="", labels=False, domainWidth=0, tickWidth=0)
+    if limits_dim is not None:
+        scales = {d: alt.Scale(domain=limits_dim[d], zero=False) for d in labels_dim}
+
     def make_upper(r, w, no_x=True, no_y=True, **kwargs):
         enc_x_keywords = {"type": "quantitative"}
         enc_y_keywords = {"type": "quantitative"}
 
-        if limits is not None:
-            enc_x_keywords["scale"] = alt.Scale(domain=limits_dim[r], zero=False)
-            enc_y_keywords["scale"] = alt.Scale(domain=limits_dim[w], zero=False)
+        if limits_dim is not None:
+            enc_x_keywords["scale"] = scales[r]
+            enc_y_keywords["scale"] = scales[w]
             axis_limits = {"values": limits_dim[r]}
         else:
             axis_limits = {}
 
         if no_x:
-            enc_x_keywords["axis"] = alt.Axis(
-                title="", labels=False, domainWidth=0, tickWidth=0,
-            )
+            enc_x_keywords["axis"] = empty_axis
         else:
             enc_x_keywords["axis"] = alt.Axis(**axis_limits, **axis_format,)
         if no_y:
-            enc_y_keywords["axis"] = alt.Axis(
-                title="", labels=False, domainWidth=0, tickWidth=0,
-            )
+            enc_y_keywords["axis"] = empty_axis
         else:
             enc_y_keywords["axis"] = alt.Axis(
                 title=w,
@@ -130,23 +219,19 @@ def pairplot(
 
         enc_x_keywords["type"] = "quantitative"
 
-        if limits is not None:
-            enc_x_keywords["scale"] = alt.Scale(domain=limits_dim[r], zero=False)
+        if limits_dim is not None:
+            enc_x_keywords["scale"] = scales[r]
             axis_limits = {"values": limits_dim[r]}
         else:
             axis_limits = {}
 
         if no_x:
-            enc_x_keywords["axis"] = alt.Axis(
-                title="", labels=False, domainWidth=0, tickWidth=0,
-            )
+            enc_x_keywords["axis"] = empty_axis
         else:
             enc_x_keywords["axis"] = alt.Axis(title=r, **axis_limits, **axis_format,)
 
         if no_y:
-            enc_y_keywords["axis"] = alt.Axis(
-                title="", labels=False, domainWidth=0, tickWidth=0,
-            )
+            enc_y_keywords["axis"] = empty_axis
         else:
             enc_y_keywords["axis"] = alt.Axis(
                 title=r, labels=False, domainWidth=0, tickWidth=0, **axis_format,
@@ -158,7 +243,7 @@ def pairplot(
 
         chart = alt.Chart()
 
-        if limits is None:
+        if limits_dim is None:
             bin_keywords = {"maxbins": num_bins}
         else:
             bin_keywords = {
@@ -167,11 +252,20 @@ def pairplot(
             }
 
         chart = chart.mark_bar(opacity=bar_opacity, clip=clip)
-        chart = chart.encode(
-            x=alt.X(r, bin=alt.Bin(**bin_keywords), **enc_x_keywords,),
-            y=alt.Y("count()", stack=None, **enc_y_keywords),
-            **color_kwarg,
-        )
+        if prebinned:
+            # Data with counts per bin is attached to the chart by `pairplot`
+            chart = chart.encode(
+                x=alt.X("bin_lo", bin="binned", **enc_x_keywords),
+                x2=alt.X2("bin_hi"),
+                y=alt.Y("count", type="quantitative", stack=None, **enc_y_keywords),
+                **color_kwarg,
+            )
+        else:
+            chart = chart.encode(
+                x=alt.X(r, bin=alt.Bin(**bin_keywords), **enc_x_keywords,),
+                y=alt.Y("count()", stack=None, **enc_y_keywords),
+                **color_kwarg,
+            )
 
         if height is not None:
             chart = chart.properties(height=height)
@@ -194,6 +288,132 @@ def pairplot(
     return chart
 
 
+@cache_chart
+def _build_facet_chart(
+    df: pd.DataFrame,
+    labels_dim: List[str],
+    domain: Optional[List[float]],
+    scatter_size: float,
+    color: Optional[Union[str, alt.Color]],
+    bar_opacity: float,
+    clip: bool,
+    height: Optional[int],
+    width: Optional[int],
+) -> Chart:
+    axis = alt.Axis(title="", labels=False, domainWidth=0, tickWidth=0)
+    scale = alt.Scale(zero=False) if domain is None else alt.Scale(domain=domain)
+
+    color_kwarg = {} if color is None else {"color": color}
+
+    scatter = (
+        alt.Chart()
+        .transform_filter("datum.row_dim != datum.col_dim")
+        .mark_circle(size=scatter_size, clip=clip)
+        .encode(
+            x=alt.X("x_val", type="quantitative", axis=axis, scale=scale),
+            y=alt.Y("y_val", type="quantitative", axis=axis, scale=scale),
+            **color_kwarg,
+        )
+    )
+
+    hist = (
+        alt.Chart()
+        .transform_filter("datum.row_dim == datum.col_dim")
+        .mark_bar(opacity=bar_opacity, clip=clip)
+        .encode(
+            x=alt.X(
+                "bin_lo", bin="binned", type="quantitative", axis=axis, scale=scale
+            ),
+            x2=alt.X2("bin_hi"),
+            y=alt.Y("count", type="quantitative", axis=axis, stack=None),
+            **color_kwarg,
+        )
+    )
+
+    # Counts of histograms must not share the y-scale of scatter plots
+    chart = alt.layer(scatter, hist, data=df).resolve_scale(y="independent")
+
+    if height is not None:
+        chart = chart.properties(height=height)
+
+    if width is not None:
+        chart = chart.properties(width=width)
+
+    chart = chart.facet(
+        row=alt.Row("row_dim", type="nominal", sort=labels_dim, title=None),
+        column=alt.Column("col_dim", type="nominal", sort=labels_dim, title=None),
+    )
+
+    return chart.resolve_scale(x="independent", y="independent")
+
+
+def _long_form(
+    df: pd.DataFrame,
+    labels_dim: List[str],
+    field: str,
+    histograms: Dict[str, pd.DataFrame],
+) -> pd.DataFrame:
+    """Stacks samples of all pairs of dimensions and histograms for `pairplot`
+
+    Returns:
+        Dataframe with `row_dim` and `col_dim` naming the panel, `x_val` and `y_val`
+        for scatter plots, and histograms on the diagonal
+    """
+    parts = []
+    for r in labels_dim:
+        for c in labels_dim:
+            if r == c:
+                parts.append(histograms[r].assign(row_dim=r, col_dim=c))
+            else:
+                parts.append(
+                    pd.DataFrame(
+                        {
+                            "row_dim": r,
+                            "col_dim": c,
+                            "x_val": df[c].to_numpy(),
+                            "y_val": df[r].to_numpy(),
+                            field: df[field].to_numpy(),
+                        }
+                    )
+                )
+
+    return pd.concat(parts, ignore_index=True)
+
+
+def _histograms(
+    df: pd.DataFrame,
+    limits_dim: Dict[str, List[float]],
+    num_bins: int,
+    by: Optional[str] = None,
+) -> Dict[str, pd.DataFrame]:
+    """Histograms per dimension with `num_bins` bins of equal width spanning the limits
+
+    Unlike binning in Vega-Lite, bin boundaries are not adjusted to nice values, so
+    bins may be shifted with respect to those of charts binned by Vega-Lite.
+
+    Returns:
+        Dictionary with a dataframe of `bin_lo`, `bin_hi` and `count` (and `by`, if
+        given) for each dimension, leaving out empty bins
+    """
+    groups = [(None, df)] if by is None else df.groupby(by, sort=False, observed=True)
+
+    histograms = {}
+    for r, (lo, hi) in limits_dim.items():
+        edges = np.linspace(lo, hi, num_bins + 1)
+        hists = []
+        for key, group in groups:
+            counts, _ = np.histogram(group[r].to_numpy(), bins=edges)
+            hist = pd.DataFrame(
+                {"bin_lo": edges[:-1], "bin_hi": edges[1:], "count": counts}
+            )
+            if by is not None:
+                hist[by] = key
+            hists.append(hist[counts > 0])
+        histograms[r] = pd.concat(hists, ignore_index=True)
+
+    return histograms
+
+
 class Matrix:
     def __init__(self, data, interactive=False):
         self.data = data
@@ -242,13 +462,14 @@ class Matrix:
         return self
 
     def render(self):
-        chart = alt.vconcat(data=self.data)
+        rows = []
         for i, _ in enumerate(self.rows):
-            row = alt.hconcat()
-            for j, _ in enumerate(self.cols):
-                if self.grid[i][j] is not None:
-                    row |= self.grid[i][j]
-            if len(row.hconcat) > 0:
-                chart &= row
-
-        return chart
+            cells = [
+                self.grid[i][j]
+                for j, _ in enumerate(self.cols)
+                if self.grid[i][j] is not None
+            ]
+            if len(cells) > 0:
+                rows.append(alt.hconcat(*cells))
+
+        return alt.vconcat(*rows, data=self.data)
@@ -2,7 +2,6 @@ from functools import partial
 from typing import Any, Dict, Optional
 
 import altair as alt
-from mergedeep import merge
 
 
 def get_style() -> Dict[str, Any]:
@@ -51,7 +50,6 @@ def set_style(
     Returns:
         None
     """
-
     theme_font_family = _custom_font_family(font_family)
     theme_font_size_label = _custom_font_size_label(
         font_size if font_size_label is None else font_size_label
@@ -74,8 +72,8 @@ def set_style(
     }
     theme_border = {"config": {"view": {"strokeWidth": 0}}} if not border else {}
 
-    theme = merge(
-        {},
+    theme = {"config": {}}
+    for fragment in (
         theme_border,
         theme_font_family,
         theme_font_size_label,
@@ -86,7 +84,16 @@ def set_style(
         theme_height,
         theme_width,
         extra,
-    )
+    ):
+        for key, value in fragment.items():
+            if key == "config":
+                for section, sub in value.items():
+                    if isinstance(sub, dict):
+                        theme["config"].setdefault(section, {}).update(sub)
+                    else:
+                        theme["config"][section] = sub
+            else:
+                theme[key] = value
 
     def custom_theme():
         return theme
@@ -1,15 +1,165 @@
+import inspect
+import re
 import subprocess
 import time
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import altair as alt
-import flatlatex
 import numpy as np
 import pandas as pd
+from altair.vegalite.v4.schema.channels import FieldChannelMixin
 
 Chart = alt.vegalite.v4.api.Chart
 
+_FIELD_ESCAPE = re.compile(r"([\\.\[\]])")
+
+
+def cache_chart(make_chart: Callable[..., Chart]) -> Callable[..., Chart]:
+    """Cache charts built by `make_chart` on everything but the contents of the data
+
+    The first argument of `make_chart` is taken to be the data. Charts are keyed on
+    the columns and dtypes of the data and the values of all other arguments. On a
+    cache hit, a copy of the cached chart is returned with the new data attached,
+    skipping the construction (and validation) of the chart's Altair objects.
+
+    The returned function takes an additional keyword argument `compact_data`, which
+    is not passed on to `make_chart`. If True, the data is attached column-wise and
+    unpacked into rows by a `flatten` transform in Vega-Lite, which avoids repeating
+    each column name once per row in the serialized chart. This is only done while
+    Altair's default data transformer is enabled, whose `max_rows` limit still
+    applies.
+
+    Args:
+        make_chart: Function building a chart with data at the top level
+
+    Returns:
+        Function with the signature of `make_chart` and `compact_data`
+    """
+    signature = inspect.signature(make_chart)
+    data_arg = next(iter(signature.parameters))
+
+    @lru_cache(maxsize=32)
+    def build(key: _ChartKey) -> Chart:
+        chart = make_chart(key.data, **key.kwargs).copy()
+        # Altair can only infer types while data is a DataFrame, not for compact data
+        _infer_types(chart, key.data)
+        chart.data = alt.Undefined
+        key.data = None
+        return chart
+
+    @wraps(make_chart)
+    def wrapper(*args, compact_data: bool = False, **kwargs) -> Chart:
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        kwargs = dict(arguments.arguments)
+        data = kwargs.pop(data_arg)
+        compact_data = compact_data and alt.data_transformers.active == "default"
+
+        chart = build(_ChartKey(data, **kwargs)).copy()
+        if compact_data:
+            # Raises MaxRowsError like the default data transformer would
+            alt.utils.data.limit_rows(data, **alt.data_transformers.options)
+            data = alt.utils.sanitize_dataframe(data)
+            values = {c: data[c].tolist() for c in data.columns}
+            chart.data = alt.InlineData(values=[values])
+            transform = [] if chart.transform is alt.Undefined else chart.transform
+            # Vega reads fields of `flatten` as paths, so characters such as dots
+            # are escaped, and the original names are restored with `as`
+            chart.transform = [
+                alt.FlattenTransform(
+                    flatten=[_escape_field(c) for c in data.columns],
+                    **{"as": list(data.columns)},
+                ),
+                *transform,
+            ]
+        else:
+            chart.data = data
+        return chart
+
+    wrapper.cache_clear = build.cache_clear
+    return wrapper
+
+
+def encoding_field(encoding: Union[str, alt.SchemaBase]) -> Optional[str]:
+    """Field of an encoding given as shorthand or channel
+
+    Args:
+        encoding: Encoding, e.g., `"x:Q"` or `alt.Color("x:Q")`
+
+    Returns:
+        Name of field, None unless the encoding refers to a plain field (without
+        aggregation, binning or time unit)
+    """
+    if isinstance(encoding, str):
+        kwds = alt.utils.parse_shorthand(encoding)
+    elif isinstance(encoding, alt.SchemaBase):
+        kwds = {k: v for k, v in encoding._kwds.items() if v is not alt.Undefined}
+        shorthand = kwds.pop("shorthand", None)
+        if isinstance(shorthand, str):
+            kwds.update(alt.utils.parse_shorthand(shorthand))
+    else:
+        return None
+
+    if any(k in kwds for k in ("aggregate", "bin", "timeUnit")):
+        return None
+    return kwds.get("field", None)
+
+
+class _ChartKey:
+    """Hashable key for `cache_chart`, which holds on to the data while building"""
+
+    def __init__(self, data: pd.DataFrame, **kwargs):
+        self.data = data
+        self.kwargs = kwargs
+        self.key = (_hashable(data), _hashable(kwargs))
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _ChartKey) and self.key == other.key
+
+
+def _escape_field(name: str) -> str:
+    """Escapes characters which Vega interprets in field paths"""
+    return _FIELD_ESCAPE.sub(r"\\\1", name)
+
+
+def _infer_types(obj: Any, data: pd.DataFrame) -> None:
+    """Sets missing types of encoding shorthands, which Altair infers from data"""
+    if isinstance(obj, FieldChannelMixin):
+        shorthand = obj._get("shorthand")
+        if isinstance(shorthand, str) and obj._kwds.get("type", None) is alt.Undefined:
+            parsed = alt.utils.parse_shorthand(shorthand, data=data)
+            if "type" in parsed:
+                obj.type = parsed["type"]
+    if isinstance(obj, alt.SchemaBase):
+        for value in (*obj._args, *obj._kwds.values()):
+            _infer_types(value, data)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _infer_types(value, data)
+    elif isinstance(obj, list):
+        for value in obj:
+            _infer_types(value, data)
+
+
+def _hashable(obj: Any) -> Any:
+    if isinstance(obj, pd.DataFrame):
+        return (tuple(obj.columns), tuple(str(d) for d in obj.dtypes))
+    elif isinstance(obj, np.ndarray):
+        return (obj.shape, str(obj.dtype), obj.tobytes())
+    elif isinstance(obj, alt.SchemaBase):
+        return (type(obj), _hashable(obj._args), _hashable(obj._kwds))
+    elif isinstance(obj, dict):
+        return frozenset((k, _hashable(v)) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        return tuple(_hashable(o) for o in obj)
+    else:
+        return obj
+
 
 def display_img(img: str) -> None:
     """Display image inside notebook while preventing browser caching
@@ -24,13 +174,17 @@ def display_img(img: str) -> None:
 
 def rgb2hex(r: int, g: int, b: int) -> str:
     """Convert RGB to HEX"""
-    return "#{:02x}{:02x}{:02x}".format(r, g, b)
+    return "#{:06x}".format((r << 16) | (g << 8) | b)
 
 
 def hex2rgb(hex: str) -> Tuple[int]:
     """Convert HEX to RGB"""
     h = hex.lstrip("#")
-    return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
+    if len(h) < 6:
+        raise ValueError(f"Expected at least 6 hex digits, got {hex!r}")
+    # Digits beyond RGB, e.g. alpha, are ignored
+    v = int(h[:6], 16)
+    return (v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF
 
 
 def convert_file(
@@ -42,7 +196,7 @@ def convert_file(
 ) -> str:
     """Convert files with Inkscape
 
-    Assumes that Inkscape can be called from shell with `inkscape`.
+    Assumes that Inkscape can be called with `inkscape`.
 
     Args:
         fn: Filename
@@ -54,22 +208,37 @@ def convert_file(
     Returns:
         New filename
     """
+    process, fn_new = _start_conversion(
+        fn, to=to, dpi=dpi, background=background, debug=debug
+    )
+    process.wait()
+
+    return fn_new
+
+
+def _start_conversion(
+    fn: str,
+    to: str = "png",
+    dpi: int = 300,
+    background: Optional[str] = None,
+    debug: bool = False,
+) -> Tuple[subprocess.Popen, Path]:
+    """Starts `convert_file` without waiting for Inkscape to finish"""
     fn = Path(fn).absolute()
     fn_new = fn.with_suffix(f".{to}")
 
-    cmd = f"inkscape --export-filename={str(fn_new)} {str(fn)} --export-dpi={dpi}"
+    cmd = ["inkscape", f"--export-filename={fn_new}", str(fn), f"--export-dpi={dpi}"]
 
     if background is not None:
-        cmd += " --export-background='{background}'"
+        cmd.append(f"--export-background={background}")
 
     if debug:
-        print(cmd)
+        print(" ".join(cmd))
+        output = None
     else:
-        cmd += " &> /dev/null"
+        output = subprocess.DEVNULL
 
-    subprocess.call(cmd, shell=True)
-
-    return fn_new
+    return subprocess.Popen(cmd, stdout=output, stderr=output), fn_new
 
 
 def save(
@@ -83,7 +252,7 @@ def save(
     `altair_saver` seems to work best with `.svg` exports. When `extra_formats` is
     specified, the saved file (e.g., a `svg`) can be converted using the `convert_file`
     function which uses `inkscape` for file conversion (e.g., to save `png` or `pdf`
-    versions of a chart).
+    versions of a chart). Conversions to different formats run in parallel.
 
     Args:
         chart: Chart to save
@@ -104,8 +273,11 @@ def save(
         formats = (
             [extra_formats] if not isinstance(extra_formats, list) else extra_formats
         )
-        for ff in formats:
-            convert_file(path, to=ff, debug=debug)
+        processes = [
+            _start_conversion(path, to=ff, debug=debug)[0] for ff in formats
+        ]
+        for process in processes:
+            process.wait()
 
 
 def latex2unicode(latex: Union[str, List[str]]) -> Union[str, List[str]]:
@@ -117,21 +289,32 @@ def latex2unicode(latex: Union[str, List[str]]) -> Union[str, List[str]]:
     Returns:
         Unicode strings
     """
-    c = flatlatex.converter()
     if type(latex) == str:
-        return c.convert(latex)
+        return _convert_latex(latex)
     elif type(latex) == list:
-        return [c.convert(entry) for entry in latex]
+        return [_convert_latex(entry) for entry in latex]
     else:
         raise NotImplementedError
 
 
+@lru_cache(maxsize=1)
+def _get_converter() -> Any:
+    import flatlatex
+
+    return flatlatex.converter()
+
+
+@lru_cache(maxsize=4096)
+def _convert_latex(latex: str) -> str:
+    return _get_converter().convert(latex)
+
+
 def np2df(
     samples: Union[np.ndarray, List[np.ndarray]],
     field: str = "samples",
     labels_samples: Optional[Union[str, List[str]]] = None,
     labels_dim: List[str] = None,
-    drop_dim: Optional[List[str]] = None,
+    drop_dim: Optional[Union[str, List[str]]] = None,
 ) -> pd.DataFrame:
     """Converts numpy arrays to pandas DataFrame used for plotting with `deneb.pairplot`
 
@@ -162,17 +345,20 @@ def np2df(
         labels_dim = [f"dim {i+1}" for i in range(dim_samples)]
     assert len(labels_dim) == dim_samples
 
-    dfs = []
-    for i, sample in enumerate(samples):
-        df = pd.DataFrame(sample, columns=labels_dim)
-        df[field] = labels_samples[i]
-        dfs.append(df)
-    df = pd.concat(dfs, ignore_index=True)
-
     if drop_dim is not None:
-        df = df.drop(columns=drop_dim)
+        if not isinstance(drop_dim, list):
+            drop_dim = [drop_dim]
+        for dd in drop_dim:
+            assert dd in labels_dim
+        keep = np.array([ld not in drop_dim for ld in labels_dim], dtype=bool)
+        samples = [sample[:, keep] for sample in samples]
         labels_dim = [ld for ld in labels_dim if ld not in drop_dim]
 
+    df = pd.DataFrame(np.concatenate(samples, axis=0), columns=labels_dim, copy=False)
+    df[field] = np.repeat(
+        np.array(labels_samples, dtype=object), [s.shape[0] for s in samples]
+    )
+
     return df
 
 
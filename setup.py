@@ -22,7 +22,6 @@ REQUIRED = [
     "altair<=4.2.0", 
     "altair_saver", 
     "flatlatex", 
-    "mergedeep", 
     "vega_datasets",
 ]
 EXTRAS = {